@@ -24,6 +24,15 @@ from click.utils import open_file as open_file
 
 from .main import RichTyper
 from .core import RichContext as Context
+from .params import ParamSet as ParamSet
+from .output import echo_csv as echo_csv
+from .output import echo_jsonl as echo_jsonl
+from .output import echo_table as echo_table
+from .progress import Progress as Progress
+from .progress import track as track
+from .render import render_help as render_help
+from .signature import clear_signature_cache as clear_signature_cache
+from .signature import signature_cache_info as signature_cache_info
 
 from typer import colors as colors
 from typer import run as run
@@ -1,15 +1,23 @@
-from .main import RichTyper
-from . import Argument, Option, __version__
+import json
+
+import typer
+
+from .main import RichTyper, get_command
+from .doctor import SortKey, diagnose, print_report, sort_commands
+from .export import dump_commands
+from .utils import import_app
+from . import Argument, Option, FileTextWrite, __version__
 
 
-app = RichTyper()
 banner = f"[b]Rich Typer[/b] [magenta]v{__version__}[/] 🤑\n\n[dim]将 Rich 与 Typer 结合起来，使界面更加漂亮。\n"
 
 url = "♥ https://github.com/Elinpf/rich_typer"
 
+app = RichTyper(banner=banner, banner_justify='center', epilog=url)
+
 
 @app.command(banner=banner, banner_justify='center', epilog=url)
-def main(
+def example(
     name: str = Argument(...,
                          help="Name of the [green]person to greet[/]."),
     message: str = Option('ms', '-m', '--message',
@@ -21,4 +29,46 @@ def main(
     ...
 
 
+@app.command()
+def export(
+    target: str = Argument(...,
+                           help="The app to export, as [green]module:app[/]."),
+    ndjson: bool = Option(False, '--ndjson',
+                          help="Write one command per line instead of a JSON array."),
+    output: FileTextWrite = Option('-', '-o', '--output',
+                                   help="Write to a file instead of stdout."),
+) -> None:
+    """Export the command tree of an app as JSON without rendering help."""
+    try:
+        obj = import_app(target)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise typer.BadParameter(str(e), param_hint="TARGET")
+    command = get_command(obj) if isinstance(obj, typer.Typer) else obj
+    module_name = target.partition(":")[0].rpartition(".")[2]
+    dump_commands(command, output, ndjson=ndjson,
+                  info_name=command.name or module_name)
+
+
+@app.command()
+def doctor(
+    target: str = Argument(...,
+                           help="The app to analyze, as [green]module:app[/]."),
+    width: int = Option(80, '-w', '--width',
+                        help="Width used to render the help of each command."),
+    top: int = Option(20, '-n', '--top',
+                      help="Number of commands to show."),
+    sort: SortKey = Option(SortKey.total.value, '-s', '--sort',
+                           help="Column used to sort the commands."),
+    as_json: bool = Option(False, '--json',
+                           help="Write the report as JSON."),
+) -> None:
+    """Report import, build and help render cost of every command of an app."""
+    report = diagnose(target, width)
+    if as_json:
+        report["commands"] = sort_commands(report, sort, top)
+        typer.echo(json.dumps(report, indent=2))
+    else:
+        print_report(report, sort, top)
+
+
 app()
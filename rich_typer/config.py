@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import click
+
+# 命令路径（以空格连接）-> {参数名: [值, 来源文件]}
+Sections = Dict[str, Dict[str, List[Any]]]
+
+
+def _load_toml(path: str) -> Any:
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib  # type: ignore
+        except ImportError:
+            raise click.ClickException(
+                f"Reading {path} requires Python 3.11+ or the 'tomli' package")
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def _load_yaml(path: str) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise click.ClickException(f"Reading {path} requires the 'PyYAML' package")
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def _load_json(path: str) -> Any:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+LOADERS = {
+    ".toml": _load_toml,
+    ".yaml": _load_yaml,
+    ".yml": _load_yaml,
+    ".json": _load_json,
+}
+
+
+def load_config_file(path: str) -> Dict[str, Any]:
+    loader = LOADERS.get(os.path.splitext(path)[1].lower())
+    if loader is None:
+        raise click.ClickException(f"Unsupported config file type: {path}")
+    try:
+        data = loader(path)
+    except click.ClickException:
+        raise
+    except Exception as e:
+        raise click.ClickException(f"Invalid config file {path}: {e}")
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise click.ClickException(f"Invalid config file {path}: expected a mapping")
+    return data
+
+
+def _flatten(data: Dict[str, Any], source: str, path: Tuple[str, ...], sections: Sections) -> None:
+    section = sections.setdefault(" ".join(path), {})
+    for key, value in data.items():
+        if isinstance(value, dict):
+            _flatten(value, source, path + (key,), sections)
+        else:
+            section[key] = [value, source]
+
+
+class ConfigStore:
+    """按层加载配置文件（后面的文件覆盖前面的），解析结果缓存在 cache_dir 中
+
+    缓存以每个文件的路径、mtime、大小为键，文件变化后重新解析。
+    """
+
+    def __init__(self, files: Sequence[str], cache_dir: Optional[str] = None) -> None:
+        self.files = [os.path.abspath(os.path.expanduser(file)) for file in files]
+        self.cache_dir = cache_dir
+        self._sections: Optional[Sections] = None
+
+    @property
+    def sections(self) -> Sections:
+        if self._sections is None:
+            self._sections = self._load()
+        return self._sections
+
+    def _stat_files(self) -> List[Tuple[str, int, int]]:
+        stats = []
+        for file in self.files:
+            try:
+                stat = os.stat(file)
+            except OSError:
+                continue
+            stats.append((file, stat.st_mtime_ns, stat.st_size))
+        return stats
+
+    def _cache_path(self) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1("\0".join(self.files).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"config-{digest}.json")
+
+    def _load(self) -> Sections:
+        stats = [list(stat) for stat in self._stat_files()]
+        cache_path = self._cache_path()
+        if cache_path:
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    cache = json.load(f)
+                if cache["files"] == stats:
+                    return cache["sections"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        sections: Sections = {}
+        for file, _, _ in stats:
+            _flatten(load_config_file(file), file, (), sections)
+
+        if cache_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)  # type: ignore
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"files": stats, "sections": sections}, f, default=str)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass
+        return sections
+
+
+class ConfigDefaults(Mapping):
+    """click 的 default_map，只在访问时取出对应命令路径的配置
+
+    子命令的 Context 通过 default_map.get(命令名) 得到下一层的 ConfigDefaults。
+    """
+
+    def __init__(self, store: ConfigStore, path: Tuple[str, ...] = ()) -> None:
+        self.store = store
+        self.path = path
+
+    @property
+    def _section(self) -> Dict[str, List[Any]]:
+        return self.store.sections.get(" ".join(self.path), {})
+
+    def _has_child(self, key: str) -> bool:
+        return " ".join(self.path + (key,)) in self.store.sections
+
+    def __getitem__(self, key: str) -> Any:
+        section = self._section
+        if key in section:
+            return section[key][0]
+        if self._has_child(key):
+            return ConfigDefaults(self.store, self.path + (key,))
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        prefix = " ".join(self.path)
+        children = []
+        for name in self.store.sections:
+            if not name or name == prefix:
+                continue
+            parent, _, child = name.rpartition(" ")
+            if parent == prefix:
+                children.append(child)
+        return iter([*self._section, *children])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def source(self, key: str) -> Optional[str]:
+        """参数默认值来自哪个配置文件"""
+        value = self._section.get(key)
+        return value[1] if value else None
+
+
+def get_config_defaults(
+    files: Sequence[str], cache_dir: Optional[str] = None
+) -> ConfigDefaults:
+    return ConfigDefaults(ConfigStore(files, cache_dir))
+
+
+def get_config_help_record(
+    param: click.Parameter, ctx: click.Context, value: Any
+) -> Optional[Tuple[str, str]]:
+    """以配置中的值作为默认值生成帮助信息
+
+    click 对 --flag/--no-flag 这类布尔选项按 param.default 显示默认值，
+    不会读取 default_map，这里在参数的副本上替换默认值。
+    """
+    param = copy.copy(param)
+    try:
+        param.default = param.type_cast_value(ctx, value)
+    except click.BadParameter:
+        param.default = value
+    return param.get_help_record(ctx)
+
+
+def add_config_source(help: str, source: str) -> str:
+    """在帮助信息末尾的 [default: ...] 中注明配置来源"""
+    home = os.path.expanduser("~")
+    if source.startswith(home + os.sep):
+        source = "~" + source[len(home):]
+    if help.endswith("]"):
+        return f"{help[:-1]}; config: {source}]"
+    return f"{help}  [config: {source}]".lstrip()
@@ -6,13 +6,15 @@ import click
 from click.core import Context, Parameter
 from typer.core import TyperCommand, TyperGroup
 
-from .formatting import RichHelpFormatter
+from .config import ConfigDefaults, add_config_source, get_config_help_record
+from .formatting import BaseHelpFormatter, PlainHelpFormatter, RichHelpFormatter, is_plain_output
+from .params import get_help_record
 
 
 def _rich_typer_format_banner(
     self: click.core.Command,
     ctx: Context,
-    formatter: RichHelpFormatter
+    formatter: BaseHelpFormatter
 ) -> None:
     if self.banner:
         formatter.write_banner(self.banner, self.banner_justify)
@@ -21,12 +23,22 @@ def _rich_typer_format_banner(
 def _rich_typer_format_options(
     self: click.core.Command,
     ctx: Context,
-    formatter: RichHelpFormatter
+    formatter: BaseHelpFormatter
 ) -> None:
     args = []
     opts = []
+    default_map = ctx.default_map
     for param in self.get_params(ctx):
-        rv = param.get_help_record(ctx)
+        source = None
+        if isinstance(default_map, ConfigDefaults) and param.name:
+            source = default_map.source(param.name)
+        if source:
+            # 显示的默认值必须与实际使用的配置值一致
+            rv = get_config_help_record(param, ctx, default_map[param.name])  # type: ignore
+            if rv is not None:
+                rv = (rv[0], add_config_source(rv[1], source))
+        else:
+            rv = get_help_record(param, ctx)
         if rv is not None:
             if param.param_type_name == "argument":
                 args.append(rv)
@@ -41,8 +53,25 @@ def _rich_typer_format_options(
             formatter.add_params(opts, table)
 
 
+def _rich_typer_get_usage(self: click.core.Command, ctx: Context) -> str:
+    # 出错时 click 会把 usage 与错误信息一起输出到 stderr，这里只渲染成字符串
+    formatter = ctx.make_formatter()
+    return formatter.capture(lambda: self.format_usage(ctx, formatter)).rstrip("\n")
+
+
 class RichContext(click.core.Context):
     formatter_class: Type["RichHelpFormatter"] = RichHelpFormatter
+    plain_formatter_class: Type["PlainHelpFormatter"] = PlainHelpFormatter
+
+    def make_formatter(self) -> BaseHelpFormatter:
+        # 显式设置了 color 时总是使用 Rich 渲染
+        if self.color is None and is_plain_output():
+            formatter_class = self.plain_formatter_class
+        else:
+            formatter_class = self.formatter_class
+        return formatter_class(
+            width=self.terminal_width, max_width=self.max_content_width, color=self.color
+        )
 
 
 class RichCommand(TyperCommand):
@@ -87,27 +116,30 @@ class RichCommand(TyperCommand):
             deprecated=deprecated
         )
 
-    def format_help(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_help(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         self.format_banner(ctx, formatter)
         self.format_usage(ctx, formatter)
         self.format_help_text(ctx, formatter)
         self.format_options(ctx, formatter)
         self.format_epilog(ctx, formatter)
 
-    def format_banner(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_banner(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         _rich_typer_format_banner(self, ctx=ctx, formatter=formatter)
 
-    def format_usage(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_usage(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         if self.usage:
             formatter.write(self.usage)
             formatter.write("\n")
         else:
             super().format_usage(ctx, formatter)
 
-    def format_options(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def get_usage(self, ctx: "Context") -> str:
+        return _rich_typer_get_usage(self, ctx)
+
+    def format_options(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         _rich_typer_format_options(self, ctx=ctx, formatter=formatter)
 
-    def format_epilog(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_epilog(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         if self.epilog:
             formatter.write_epilog(self.epilog, self.epilog_blend)
 
@@ -128,24 +160,27 @@ class RichGroup(TyperGroup):
         self.usage = attrs.pop("usage", None)
         super().__init__(name=name, commands=commands, **attrs)
 
-    def format_help(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_help(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         self.format_banner(ctx, formatter)
         self.format_usage(ctx, formatter)
         self.format_help_text(ctx, formatter)
         self.format_options(ctx, formatter)
         self.format_epilog(ctx, formatter)
 
-    def format_banner(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_banner(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         _rich_typer_format_banner(self, ctx, formatter)
 
-    def format_usage(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_usage(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         if self.usage:
             formatter.write(self.usage)
             formatter.write("\n")
         else:
             super().format_usage(ctx, formatter)
 
-    def format_commands(self, ctx: Context, formatter: RichHelpFormatter) -> None:
+    def get_usage(self, ctx: "Context") -> str:
+        return _rich_typer_get_usage(self, ctx)
+
+    def format_commands(self, ctx: Context, formatter: BaseHelpFormatter) -> None:
         """Extra format methods for multi methods that adds all the commands
         after the options.
         """
@@ -173,10 +208,10 @@ class RichGroup(TyperGroup):
                 with formatter.section("Commands") as table:
                     formatter.add_params(rows, table)
 
-    def format_options(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_options(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         _rich_typer_format_options(self, ctx=ctx, formatter=formatter)
         self.format_commands(ctx, formatter)
 
-    def format_epilog(self, ctx: "Context", formatter: RichHelpFormatter) -> None:
+    def format_epilog(self, ctx: "Context", formatter: BaseHelpFormatter) -> None:
         if self.epilog:
             formatter.write_epilog(self.epilog, self.epilog_blend)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from enum import Enum
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import click
+import typer
+from rich.console import Console
+from rich.table import Table
+from typer.main import get_command_name
+
+from .formatting import get_console
+from .main import get_command, get_command_from_info, get_group_from_info, solve_typer_info_defaults
+from .models import CommandInfo, TyperInfo
+from .render import render_help
+from .signature import clear_signature_cache
+from .utils import import_app
+
+
+class SortKey(str, Enum):
+    total = "total"
+    import_ = "import"
+    build = "build"
+    render = "render"
+    memory = "memory"
+    params = "params"
+
+
+SORT_FIELDS = {
+    SortKey.total: "total_ms",
+    SortKey.import_: "import_ms",
+    SortKey.build: "build_ms",
+    SortKey.render: "render_ms",
+    SortKey.memory: "memory_kib",
+    SortKey.params: "params",
+}
+
+
+class _TimedLoader(Loader):
+    def __init__(self, loader: Loader, times: Dict[str, float]) -> None:
+        self.loader = loader
+        self.times = times
+
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        start = perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            # 包含该模块导入的其他模块的时间
+            self.times[module.__name__] = perf_counter() - start
+            module.__loader__ = self.loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self.loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.loader, name)
+
+
+class _ImportTimer(MetaPathFinder):
+    def __init__(self) -> None:
+        self.times: Dict[str, float] = {}
+
+    def find_spec(
+        self, fullname: str, path: Optional[Sequence[str]], target: Optional[ModuleType] = None
+    ) -> Optional[ModuleSpec]:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self.times)
+            return spec
+        return None
+
+
+@contextmanager
+def time_imports() -> Iterator[Dict[str, float]]:
+    """记录期间每个新导入模块的耗时（秒，包含其子导入）"""
+    timer = _ImportTimer()
+    sys.meta_path.insert(0, timer)
+    try:
+        yield timer.times
+    finally:
+        sys.meta_path.remove(timer)
+
+
+def _walk_groups(info: TyperInfo, path: List[str]) -> Iterator[Tuple[List[str], TyperInfo]]:
+    yield path, info
+    for sub_group_info in info.typer_instance.registered_groups:  # type: ignore
+        name = solve_typer_info_defaults(sub_group_info).name
+        yield from _walk_groups(sub_group_info, path + [name])
+
+
+def _walk_commands(
+    typer_instance: typer.Typer, path: List[str]
+) -> Iterator[Tuple[List[str], CommandInfo]]:
+    for command_info in typer_instance.registered_commands:
+        name = command_info.name or get_command_name(command_info.callback.__name__)  # type: ignore
+        yield path + [name], command_info  # type: ignore
+    for sub_group_info in typer_instance.registered_groups:
+        name = solve_typer_info_defaults(sub_group_info).name
+        yield from _walk_commands(sub_group_info.typer_instance, path + [name])  # type: ignore
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def diagnose(target: str, width: int = 80) -> Dict[str, Any]:
+    """加载 module:app 并统计导入、构建、帮助渲染的开销
+
+    构建时间在清空签名缓存后测量，反映冷启动时的开销。
+    只有加载 target 失败时抛出 click.BadParameter，构建与渲染中的错误原样抛出。
+    """
+    with time_imports() as import_times:
+        start = perf_counter()
+        try:
+            app = import_app(target)
+        except (ImportError, AttributeError, ValueError) as e:
+            raise click.BadParameter(str(e), param_hint="TARGET")
+        import_time = perf_counter() - start
+    if not isinstance(app, typer.Typer):
+        raise click.BadParameter(f"{target!r} is not a Typer app", param_hint="TARGET")
+
+    clear_signature_cache()
+    start = perf_counter()
+    root = get_command(app)
+    build_time = perf_counter() - start
+    is_group = isinstance(root, click.MultiCommand)
+
+    groups = []
+    if is_group:
+        for path, group_info in _walk_groups(TyperInfo(app), []):
+            clear_signature_cache()
+            start = perf_counter()
+            get_group_from_info(group_info)
+            groups.append({"path": " ".join(path), "build_ms": _ms(perf_counter() - start)})
+
+    command_infos = list(_walk_commands(app, []))
+    if not is_group:
+        command_infos = [([], info) for _, info in command_infos]
+
+    clear_signature_cache()
+    build_times = []
+    for _, command_info in command_infos:
+        start = perf_counter()
+        get_command_from_info(command_info)
+        build_times.append(perf_counter() - start)
+
+    clear_signature_cache()
+    memories = []
+    param_counts = []
+    tracemalloc.start()
+    try:
+        for _, command_info in command_infos:
+            before = tracemalloc.get_traced_memory()[0]
+            command = get_command_from_info(command_info)
+            memories.append(tracemalloc.get_traced_memory()[0] - before)
+            param_counts.append(len(command.params))
+    finally:
+        tracemalloc.stop()
+
+    prog_name = root.name or target.partition(":")[0].rpartition(".")[2]
+    commands = []
+    for (path, command_info), command_build, memory, param_count in zip(
+        command_infos, build_times, memories, param_counts
+    ):
+        start = perf_counter()
+        render_help(root, path, width=width, format="text", prog_name=prog_name)
+        render_time = perf_counter() - start
+        module = getattr(command_info.callback, "__module__", None)
+        module_import = import_times.get(module)  # type: ignore
+        commands.append({
+            "path": " ".join(path) or prog_name,
+            "module": module,
+            "import_ms": _ms(module_import) if module_import is not None else None,
+            "build_ms": _ms(command_build),
+            "params": param_count,
+            "memory_kib": round(memory / 1024, 1),
+            "render_ms": _ms(render_time),
+            "total_ms": _ms(command_build + render_time),
+        })
+
+    return {
+        "target": target,
+        "width": width,
+        "import_ms": _ms(import_time),
+        "build_ms": _ms(build_time),
+        "groups": sorted(groups, key=lambda group: group["build_ms"], reverse=True),
+        "commands": commands,
+    }
+
+
+def sort_commands(report: Dict[str, Any], sort: SortKey, top: int) -> List[Dict[str, Any]]:
+    field = SORT_FIELDS[sort]
+    commands = sorted(report["commands"], key=lambda command: command[field] or 0, reverse=True)
+    return commands[:top]
+
+
+def print_report(
+    report: Dict[str, Any],
+    sort: SortKey = SortKey.total,
+    top: int = 20,
+    console: Optional[Console] = None,
+) -> None:
+    console = console or get_console()
+    console.print(
+        f"[b]{report['target']}[/]  import [yellow]{report['import_ms']:.1f}ms[/]"
+        f"  build [yellow]{report['build_ms']:.1f}ms[/]"
+        f"  commands [yellow]{len(report['commands'])}[/]"
+    )
+
+    if report["groups"]:
+        table = Table(title="Groups", title_justify="left", border_style="dim")
+        table.add_column("Group", style="args_and_cmds", no_wrap=True)
+        table.add_column("Build ms", justify="right")
+        for group in report["groups"][:top]:
+            table.add_row(group["path"] or "(root)", f"{group['build_ms']:.2f}")
+        console.print(table)
+
+    table = Table(
+        title=f"Commands (top {top} by {sort.value})", title_justify="left", border_style="dim"
+    )
+    table.add_column("Command", style="args_and_cmds", no_wrap=True)
+    table.add_column("Module", style="dim", no_wrap=True)
+    for header in ("Import ms", "Build ms", "Params", "Memory KiB", "Help ms", "Total ms"):
+        table.add_column(header, justify="right")
+    for command in sort_commands(report, sort, top):
+        import_ms = command["import_ms"]
+        table.add_row(
+            command["path"],
+            command["module"],
+            f"{import_ms:.2f}" if import_ms is not None else "-",
+            f"{command['build_ms']:.2f}",
+            str(command["params"]),
+            f"{command['memory_kib']:.1f}",
+            f"{command['render_ms']:.2f}",
+            f"{command['total_ms']:.2f}",
+        )
+    console.print(table)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+import click
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (tuple, set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def get_param_record(param: click.Parameter, ctx: click.Context) -> Dict[str, Any]:
+    default = param.default
+    if callable(default):
+        # 动态默认值不在导出时求值
+        default = None
+    return {
+        "name": param.name,
+        "kind": param.param_type_name,
+        "opts": param.opts,
+        "secondary_opts": param.secondary_opts,
+        "type": param.type.name,
+        "required": param.required,
+        "default": default,
+        "envvar": param.envvar,
+        "multiple": param.multiple,
+        "nargs": param.nargs,
+        "help": getattr(param, "help", None),
+        "is_flag": getattr(param, "is_flag", False),
+        "hidden": getattr(param, "hidden", False),
+    }
+
+
+def get_command_record(
+    command: click.Command, ctx: click.Context, path: List[str]
+) -> Dict[str, Any]:
+    is_group = isinstance(command, click.MultiCommand)
+    return {
+        "name": command.name,
+        "path": path,
+        "group": is_group,
+        "commands": command.list_commands(ctx) if is_group else [],
+        "help": command.help,
+        "short_help": command.short_help,
+        "banner": getattr(command, "banner", None),
+        "epilog": command.epilog,
+        "usage": getattr(command, "usage", None)
+        or " ".join(command.collect_usage_pieces(ctx)),
+        "hidden": command.hidden,
+        "deprecated": command.deprecated,
+        "params": [get_param_record(param, ctx) for param in command.get_params(ctx)],
+    }
+
+
+def iter_command_records(
+    command: click.Command,
+    info_name: Optional[str] = None,
+    parent: Optional[click.Context] = None,
+    path: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """逐个命令遍历命令树并生成描述信息，不经过任何帮助渲染"""
+    info_name = info_name or command.name or ""
+    path = (path or []) + [info_name]
+    # 与 Command.make_context 一样使用命令的 context_settings
+    extra = {**command.context_settings, "resilient_parsing": True}
+    ctx = command.context_class(command, info_name=info_name, parent=parent, **extra)
+    yield get_command_record(command, ctx, path)
+    if isinstance(command, click.MultiCommand):
+        for name in command.list_commands(ctx):
+            sub_command = command.get_command(ctx, name)
+            if sub_command is None:
+                continue
+            yield from iter_command_records(sub_command, name, ctx, path)
+
+
+def dump_commands(
+    command: click.Command,
+    stream: Optional[TextIO] = None,
+    ndjson: bool = False,
+    info_name: Optional[str] = None,
+) -> None:
+    """将命令树以 JSON 数组或 NDJSON 的形式流式写入 stream
+
+    :command: 根命令
+    :stream: 输出流，默认为 stdout
+    :ndjson: 每行一个命令，而不是一个 JSON 数组
+    :info_name: 根命令名称
+    """
+    if stream is None:
+        stream = sys.stdout
+    records = iter_command_records(command, info_name)
+    if ndjson:
+        for record in records:
+            stream.write(json.dumps(record, default=_json_default, ensure_ascii=False))
+            stream.write("\n")
+        return
+
+    stream.write("[")
+    for index, record in enumerate(records):
+        if index:
+            stream.write(",")
+        stream.write("\n")
+        stream.write(json.dumps(record, default=_json_default, ensure_ascii=False))
+    stream.write("\n]\n")
+
+
+def help_json_callback(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    if not value or ctx.resilient_parsing:
+        return
+    dump_commands(ctx.command, info_name=ctx.info_name)
+    ctx.exit()
+
+
+def get_help_json_option() -> click.Option:
+    return click.Option(
+        ["--help-json"],
+        is_flag=True,
+        expose_value=False,
+        is_eager=True,
+        hidden=True,
+        callback=help_json_callback,
+        help="Export the command tree as JSON and exit.",
+    )
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import os
 import re
+import sys
+import threading
 from contextlib import contextmanager
-from typing import Iterator, List, Optional, Tuple, Dict
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Dict
 
 from click import HelpFormatter as ClickHelpFormatter
+from click.formatting import wrap_text
+from rich.cells import cell_len
 from rich.console import Console, JustifyMethod
 from rich.highlighter import RegexHighlighter
 from rich.panel import Panel
@@ -12,20 +17,166 @@ from rich.table import Table
 from rich.text import Text
 from rich.theme import Theme
 
-from .utils import blend_text
+from .utils import blend_text, strip_markup
 
 
-class RichHelpFormatter(ClickHelpFormatter):
+THEME = Theme(
+    {
+        "option": "bold cyan",
+        "switch": "bold green",
+        "metavar": "bold yellow",
+        "help_require": "dim",
+        "args_and_cmds": "yellow"
+    }
+)
+
+_console: Optional[Console] = None
+_console_lock = threading.Lock()
+
+
+def get_console() -> Console:
+    """进程共享的 Console，未指定宽度和颜色时帮助信息也使用它"""
+    global _console
+    if _console is None:
+        # Progress 可能在工作线程中第一次调用
+        with _console_lock:
+            if _console is None:
+                _console = Console(theme=THEME)
+    return _console
+
+
+def is_plain_output() -> bool:
+    """stdout 不是终端，或设置了 NO_COLOR / TERM=dumb 时使用纯文本输出"""
+    if os.environ.get("FORCE_COLOR"):
+        return False
+    if os.environ.get("NO_COLOR") is not None:
+        return True
+    if os.environ.get("TERM", "").lower() in ("dumb", "unknown"):
+        return True
+    isatty = getattr(sys.stdout, "isatty", None)
+    try:
+        return not (isatty and isatty())
+    except ValueError:  # stdout 已关闭
+        return True
+
+
+UsageLine = Tuple[int, List[Tuple[str, bool]]]
+
+
+def wrap_usage(prog: str, args: str, prefix_width: int, width: int) -> List[UsageLine]:
+    """按宽度对 usage 的程序路径和参数分词换行
+
+    返回每一行的 (缩进, [(单词, 是否为参数)])，第一行的缩进即前缀宽度。
+    程序路径续行与路径开头对齐；参数续行与第一个参数对齐，
+    放不下时参数另起一行。
+
+    :prog: 程序路径
+    :args: 参数
+    :prefix_width: 前缀（如 "Usage: "）的宽度
+    :width: 可用宽度
+    """
+    lines: List[UsageLine] = [(prefix_width, [])]
+    line_width = prefix_width
+
+    def append(word: str, is_arg: bool, indent: int) -> None:
+        nonlocal line_width
+        word_width = cell_len(word)
+        if lines[-1][1]:
+            if line_width + 1 + word_width > width:
+                lines.append((indent, []))
+                line_width = indent
+            else:
+                line_width += 1
+        lines[-1][1].append((word, is_arg))
+        line_width += word_width
+
+    for word in prog.split():
+        append(word, False, prefix_width)
+    indent = line_width + 1
+    if width - indent < 20:
+        # 程序路径过长，参数另起一行
+        indent = prefix_width + 4
+        lines.append((indent, []))
+        line_width = indent
+    for word in args.split():
+        append(word, True, indent)
+    if not lines[-1][1]:
+        lines.pop()
+    return lines
+
+
+class BaseHelpFormatter(ClickHelpFormatter):
+    """RichHelpFormatter 与 PlainHelpFormatter 共同的接口
+
+    RichCommand / RichGroup 的 format_* 只使用这里声明的方法。
+    """
 
     def __init__(
         self,
         indent_increment: int = 2,
         width: Optional[int] = None,
         max_width: Optional[int] = None,
+        color: Optional[bool] = None,
     ) -> None:
         super().__init__(indent_increment=indent_increment, width=width, max_width=max_width)
+        self.color = color
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[Any]:
+        raise NotImplementedError
+
+    def add_params(self, params: List[Tuple[str, str]], table: Any) -> None:
+        raise NotImplementedError
+
+    def write_banner(self, banner: str, justify: Optional[JustifyMethod] = 'default') -> None:
+        raise NotImplementedError
+
+    def write_epilog(
+        self, epilog: str,
+        blend: Optional[Tuple[Tuple[int, int, int],
+                              Tuple[int, int, int]]] = None
+    ) -> None:
+        raise NotImplementedError
+
+    def write(
+        self, string: str | Text | Panel,
+        justify: Optional[JustifyMethod] = None,
+        soft_wrap: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    def capture(self, render: Callable[[], None]) -> str:
+        """调用 render，返回其写入的内容而不输出"""
+        raise NotImplementedError
+
+    def escape_text(self, text: str) -> str:
+        match = re.search(r"(?<!\S)(\[)(?!.*\1)(.+)\]$",
+                          text)  # 匹配最后一个中括号，且中括号前面有空格或位于开头
+        if match:
+            text = text.replace("[%s]" % match.group(2),
+                                "(%s)" % match.group(2))
+        return text
+
+
+class RichHelpFormatter(BaseHelpFormatter):
+    # 渲染好的参数行在所有命令之间共享，相同的选项（如共享参数组）只渲染一次
+    row_cache: Dict[Tuple[type, str, str], Tuple[Text, Text, Text]] = {}
+    row_cache_size: int = 4096
+
+    def __init__(
+        self,
+        indent_increment: int = 2,
+        width: Optional[int] = None,
+        max_width: Optional[int] = None,
+        color: Optional[bool] = None,
+        console: Optional[Console] = None,
+    ) -> None:
+        super().__init__(
+            indent_increment=indent_increment, width=width, max_width=max_width, color=color)
+        # 显式指定的宽度与颜色交给 Console，否则由 Rich 自动检测
+        self.console_width = width
         self.highlighters = self.init_highlighters()
-        self.console = self.init_console()
+        self.console = console or self.init_console()
 
     def init_highlighters(self) -> Dict[str, RegexHighlighter]:
         class OptionHighlighter(RegexHighlighter):
@@ -37,8 +188,8 @@ class RichHelpFormatter(ClickHelpFormatter):
 
         class HelpHighlighter(RegexHighlighter):
             highlights = [
-                # 匹配最后一个小括号，且小括号前面有空格
-                r"(?P<help_require>(\()(?!.*\2)(?<=\s\2)(.+)\)$)",
+                # 匹配最后一个小括号，且小括号前面有空格或位于开头
+                r"(?<!\S)(?P<help_require>(\()(?!.*\2)(.+)\)$)",
             ]
 
         return_highlighters = {
@@ -47,17 +198,14 @@ class RichHelpFormatter(ClickHelpFormatter):
         return return_highlighters
 
     def init_console(self) -> Console:
+        if self.console_width is None and self.color is None:
+            return get_console()
         console = Console(
-            theme=Theme(
-                {
-                    "option": "bold cyan",
-                    "switch": "bold green",
-                    "metavar": "bold yellow",
-                    "help_require": "dim",
-                    "args_and_cmds": "yellow"
-                }
-            ),
+            theme=THEME,
             # highlighter=self.highlighter,
+            width=self.console_width,
+            color_system=None if self.color is False else "auto",
+            force_terminal=self.color or None,
         )
         return console
 
@@ -71,39 +219,53 @@ class RichHelpFormatter(ClickHelpFormatter):
 
     def add_params(self, params: List[Tuple[str, str]], table: Table) -> None:
         for name, help in params:
-            arg_list = name.split(',')
-            if len(arg_list) == 2:
-                opt1 = self.highlighters['opt'](arg_list[0])
-                opt2 = self.highlighters['opt'](arg_list[1].strip())
-            else:
-                opt1 = Text("")
-                opt2 = self.highlighters['opt'](arg_list[0])
-            help = self.escape_text(help)
-            help = Text.from_markup(help, emoji=False)
+            key = (type(self), name, help)
+            row = self.row_cache.get(key)
+            if row is None:
+                row = self.render_param_row(name, help)
+                if len(self.row_cache) >= self.row_cache_size:
+                    self.row_cache.clear()
+                self.row_cache[key] = row
+            table.add_row(*row)
 
-            table.add_row(opt1, opt2, self.highlighters['help'](help))
+    def render_param_row(self, name: str, help: str) -> Tuple[Text, Text, Text]:
+        arg_list = name.split(',')
+        if len(arg_list) == 2:
+            opt1 = self.highlighters['opt'](arg_list[0])
+            opt2 = self.highlighters['opt'](arg_list[1].strip())
+        else:
+            opt1 = Text("")
+            opt2 = self.highlighters['opt'](arg_list[0])
+        help = self.escape_text(help)
+        help = Text.from_markup(help, emoji=False)
 
-    def escape_text(self, text: str) -> str:
-        match = re.search(r"(\[)(?!.*\1)(?<=\s\1)(.+)\]$",
-                          text)  # 匹配最后一个中括号，且中括号前面有空格
-        if match:
-            text = text.replace("[%s]" % match.group(2),
-                                "(%s)" % match.group(2))
-        return text
+        return opt1, opt2, self.highlighters['help'](help)
 
     def write_usage(
         self, prog: str, args: str = "", prefix: Optional[str] = None
     ) -> None:
-        # ! 如果过长 会导致换行
+        self.write(self.render_usage(prog, args, prefix), soft_wrap=True)
+        self.write("\n")
+
+    def render_usage(
+        self, prog: str, args: str = "", prefix: Optional[str] = None
+    ) -> Text:
+        """按终端宽度对 usage 换行，参数续行与第一个参数对齐"""
         if not prefix:
             prefix = "[dim]Usage: [/]"
 
-        usage_prefix = f"{prefix}{prog}"
-
-        table = Table(highlight=True, box=None, show_header=False)
-        table.add_row(usage_prefix, f"[yellow]{args}[/]")
-        self.write(table)
-        self.write("\n")
+        usage = Text(" ")
+        usage.append_text(Text.from_markup(prefix, emoji=False))
+        lines = wrap_usage(prog, args, usage.cell_len, self.console.width - 1)
+        for index, (indent, words) in enumerate(lines):
+            if index:
+                usage.append("\n" + " " * indent)
+            for word_index, (word, is_arg) in enumerate(words):
+                if word_index:
+                    usage.append(" ")
+                usage.append(word, style="yellow" if is_arg else None)
+        usage.highlight_regex(r"[\[\]]", "bold yellow")
+        return usage
 
     def write_banner(self, banner: str, justify: Optional[JustifyMethod] = 'default') -> None:
         self.write(Text.from_markup(banner, emoji=False), justify)
@@ -123,9 +285,126 @@ class RichHelpFormatter(ClickHelpFormatter):
 
     def write(
         self, string: str | Text | Panel,
-        justify: Optional[JustifyMethod] = None
+        justify: Optional[JustifyMethod] = None,
+        soft_wrap: bool = False,
     ) -> None:
         if string == "\n":
             self.console.print()
         else:
-            self.console.print(string, justify=justify)
+            self.console.print(string, justify=justify, soft_wrap=soft_wrap)
+
+    def capture(self, render: Callable[[], None]) -> str:
+        with self.console.capture() as capture:
+            render()
+        return capture.get()
+
+
+class PlainHelpFormatter(BaseHelpFormatter):
+    """与 RichHelpFormatter 相同的布局，但只做字符串填充，不经过 Rich 渲染
+
+    输出写入 click 的 buffer，由 click 负责 echo。
+    """
+
+    col_max: int = 30
+    col_spacing: int = 2
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[List[Tuple[str, str, str]]]:
+        rows: List[Tuple[str, str, str]] = []
+        yield rows
+        self.write(f"{name}:")
+        self.write_rows(rows)
+        self.write("\n")
+
+    def add_params(self, params: List[Tuple[str, str]], table: List[Tuple[str, str, str]]) -> None:
+        for name, help in params:
+            arg_list = name.split(',')
+            if len(arg_list) == 2:
+                opt1, opt2 = arg_list[0], arg_list[1].strip()
+            else:
+                opt1, opt2 = "", arg_list[0]
+            table.append((opt1, opt2, strip_markup(self.escape_text(help))))
+
+    def write_rows(self, rows: List[Tuple[str, str, str]]) -> None:
+        indent = " " * self.indent_increment
+        spacing = " " * self.col_spacing
+        opt1_width = max(cell_len(row[0]) for row in rows)
+        names = []
+        for opt1, opt2, _ in rows:
+            if opt1_width:
+                opt2 = f"{opt1:<{opt1_width}}{spacing}{opt2}"
+            names.append(opt2)
+
+        first_col = min(max(cell_len(name) for name in names), self.col_max)
+        help_indent = " " * (self.indent_increment + first_col + self.col_spacing)
+        text_width = max(self.width - len(help_indent), 10)
+
+        for name, (_, _, help) in zip(names, rows):
+            lines = wrap_text(help, text_width).splitlines() or [""]
+            if cell_len(name) <= first_col:
+                pad = " " * (first_col - cell_len(name))
+                first_line = f"{indent}{name}{pad}{spacing}{lines[0]}"
+                lines = lines[1:]
+            else:
+                first_line = f"{indent}{name}"
+            self.buffer.append(first_line.rstrip() + "\n")
+            for line in lines:
+                self.buffer.append(f"{help_indent}{line}\n")
+
+    def write_usage(
+        self, prog: str, args: str = "", prefix: Optional[str] = None
+    ) -> None:
+        prefix = strip_markup(prefix) if prefix else "Usage: "
+        lines = wrap_usage(prog, args, cell_len(prefix), self.width)
+        self.write("\n".join(
+            (prefix if index == 0 else " " * indent) + " ".join(word for word, _ in words)
+            for index, (indent, words) in enumerate(lines)
+        ))
+        self.write("\n")
+
+    def write_paragraph(self) -> None:
+        # RichHelpFormatter 的 buffer 始终为空，click 不会插入段落空行，这里保持一致
+        pass
+
+    def write_banner(self, banner: str, justify: Optional[JustifyMethod] = 'default') -> None:
+        self.write(strip_markup(banner), justify)
+
+    def write_epilog(
+        self, epilog: str,
+        blend: Optional[Tuple[Tuple[int, int, int],
+                              Tuple[int, int, int]]] = None
+    ) -> None:
+        self.write(epilog, "right")
+
+    def write(
+        self, string: str | Text | Panel,
+        justify: Optional[JustifyMethod] = None,
+        soft_wrap: bool = False,
+    ) -> None:
+        # 与 Console.print 一致：每次写入都以换行结尾
+        if string == "\n":
+            self.buffer.append("\n")
+            return
+        if isinstance(string, Text):
+            string = string.plain
+        elif not isinstance(string, str):
+            string = str(string)
+        else:
+            string = strip_markup(string)
+
+        if justify in ("center", "right"):
+            lines = []
+            for line in string.split("\n"):
+                pad = max(self.width - cell_len(line), 0)
+                if justify == "center":
+                    pad //= 2
+                lines.append(" " * pad + line if line else line)
+            string = "\n".join(lines)
+        self.buffer.append(string + "\n")
+
+    def capture(self, render: Callable[[], None]) -> str:
+        start = len(self.buffer)
+        render()
+        value = "".join(self.buffer[start:])
+        del self.buffer[start:]
+        return value
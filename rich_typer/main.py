@@ -1,4 +1,4 @@
-from typing import Any, Callable, Dict, Optional, Type, List, Tuple
+from typing import Any, Callable, Dict, Optional, Sequence, Type, List, Tuple
 import inspect
 
 import click
@@ -8,15 +8,18 @@ from typer.models import CommandFunctionType, Default, DefaultPlaceholder
 from typer.main import (
     get_install_completion_arguments,
     solve_typer_info_defaults,
-    get_params_convertors_ctx_param_name_from_function,
     get_callback,
     get_command_name,
     get_group_name,
     solve_typer_info_help,
 )
 
+from .config import get_config_defaults
 from .core import RichCommand, RichGroup
+from .export import get_help_json_option
 from .models import CommandInfo, TyperInfo
+from .params import ParamSet, get_param_sets_callback, get_param_sets_params
+from .signature import get_callback_doc, get_params_convertors_ctx_param_name
 
 
 class RichTyper(typer.Typer):
@@ -47,6 +50,9 @@ class RichTyper(typer.Typer):
         hidden: bool = Default(False),
         deprecated: bool = Default(False),
         add_completion: bool = True,
+        add_help_json: bool = True,
+        config_files: Sequence[str] = (),
+        config_cache: bool = True,
     ):
         """
         :name: 程序名称
@@ -70,10 +76,16 @@ class RichTyper(typer.Typer):
         :hidden: 是否隐藏
         :deprecated: 是否为废弃命令
         :add_completion: 是否添加自动完成
+        :add_help_json: 是否添加隐藏的 --help-json 选项，以 JSON 导出命令树
+        :config_files: 提供参数默认值的配置文件（toml/yaml/json），后面的覆盖前面的
+        :config_cache: 是否在程序目录中缓存配置文件的解析结果
         """
         if not cls:
             cls = RichGroup
         self._add_completion = add_completion
+        self._add_help_json = add_help_json
+        self._config_files = config_files
+        self._config_cache = config_cache
         self.info = TyperInfo(
             name=name,
             cls=cls,
@@ -119,6 +131,7 @@ class RichTyper(typer.Typer):
         no_args_is_help: bool = False,
         hidden: bool = False,
         deprecated: bool = False,
+        param_sets: Sequence[ParamSet] = (),
     ) -> Callable[[CommandFunctionType], CommandFunctionType]:
         """
         :name: 命令名称
@@ -136,6 +149,7 @@ class RichTyper(typer.Typer):
         :no_args_is_help: 取消参数帮助
         :hidden: 是否隐藏
         :deprecated: 是否为废弃命令
+        :param_sets: 共享参数组，由 param_set() 创建
         """
         if cls is None:
             cls = RichCommand
@@ -159,12 +173,27 @@ class RichTyper(typer.Typer):
                     no_args_is_help=no_args_is_help,
                     hidden=hidden,
                     deprecated=deprecated,
+                    param_sets=param_sets,
                 )
             )
             return f
 
         return decorator
 
+    def param_set(
+        self, name: Optional[str] = None
+    ) -> Callable[[Callable[..., Any]], ParamSet]:
+        """
+        将函数签名中的参数声明为共享参数组，通过 command(param_sets=[...]) 挂载到多个命令上。
+        参数只解析一次，命令执行前会先用参数值调用该函数。
+
+        :name: 参数组名称，默认使用函数名
+        """
+        def decorator(f: Callable[..., Any]) -> ParamSet:
+            return ParamSet(f, name=name)
+
+        return decorator
+
     def callback(
         self,
         name: Optional[str] = Default(None),
@@ -242,6 +271,22 @@ class RichTyper(typer.Typer):
         return get_command(self)(*args, **kwargs)
 
 
+def apply_config_defaults(typer_instance: typer.Typer, click_command: click.Command) -> None:
+    config_files = getattr(typer_instance, "_config_files", ())
+    if not config_files or "default_map" in click_command.context_settings:
+        return
+    cache_dir = None
+    if typer_instance._config_cache:  # type: ignore
+        app_name = typer_instance.info.name
+        if isinstance(app_name, DefaultPlaceholder) or not app_name:
+            app_name = "rich_typer"
+        cache_dir = click.get_app_dir(app_name)
+    click_command.context_settings = {
+        **click_command.context_settings,
+        "default_map": get_config_defaults(config_files, cache_dir),
+    }
+
+
 def get_group(typer_instance: typer.Typer) -> click.Command:
     group = get_group_from_info(TyperInfo(typer_instance))
     return group
@@ -261,6 +306,9 @@ def get_command(typer_instance: typer.Typer) -> click.Command:
         if typer_instance._add_completion:
             click_command.params.append(click_install_param)
             click_command.params.append(click_show_param)
+        if getattr(typer_instance, "_add_help_json", False):
+            click_command.params.append(get_help_json_option())
+        apply_config_defaults(typer_instance, click_command)
         return click_command
     elif len(typer_instance.registered_commands) == 1:
         # Create a single Command
@@ -269,6 +317,9 @@ def get_command(typer_instance: typer.Typer) -> click.Command:
         if typer_instance._add_completion:
             click_command.params.append(click_install_param)
             click_command.params.append(click_show_param)
+        if getattr(typer_instance, "_add_help_json", False):
+            click_command.params.append(get_help_json_option())
+        apply_config_defaults(typer_instance, click_command)
         return click_command
     assert False, "Could not get a command for this Typer instance"  # pragma no cover
 
@@ -291,7 +342,7 @@ def get_group_from_info(group_info: TyperInfo) -> click.Command:
         params,
         convertors,
         context_param_name,
-    ) = get_params_convertors_ctx_param_name_from_function(solved_info.callback)
+    ) = get_params_convertors_ctx_param_name(solved_info.callback)
     cls = solved_info.cls or RichGroup
     group = cls(  # type: ignore
         name=solved_info.name or "",
@@ -328,27 +379,34 @@ def get_command_from_info(command_info: CommandInfo) -> click.Command:
     assert command_info.callback, "A command must have a callback function"
     name = command_info.name or get_command_name(
         command_info.callback.__name__)
-    use_help = command_info.help
-    if use_help is None:
-        use_help = inspect.getdoc(command_info.callback)
-    else:
-        use_help = inspect.cleandoc(use_help)
     (
         params,
         convertors,
         context_param_name,
-    ) = get_params_convertors_ctx_param_name_from_function(command_info.callback)
+    ) = get_params_convertors_ctx_param_name(command_info.callback)
+    use_help = command_info.help
+    if use_help is None:
+        use_help = get_callback_doc(command_info.callback)
+    else:
+        use_help = inspect.cleandoc(use_help)
+    param_names = [param.name for param in params if param.name]
+    if context_param_name:
+        param_names.append(context_param_name)
     cls = command_info.cls or RichCommand
     command = cls(
         name=name,
         context_settings=command_info.context_settings,
-        callback=get_callback(
-            callback=command_info.callback,
-            params=params,
-            convertors=convertors,
-            context_param_name=context_param_name,
+        callback=get_param_sets_callback(
+            get_callback(
+                callback=command_info.callback,
+                params=params,
+                convertors=convertors,
+                context_param_name=context_param_name,
+            ),
+            command_info.param_sets,
         ),
-        params=params,  # type: ignore
+        params=params + get_param_sets_params(  # type: ignore
+            command_info.param_sets, name, param_names),
         help=use_help,
         epilog=command_info.epilog,
         epilog_blend=command_info.epilog_blend,
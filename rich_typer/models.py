@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Optional, Type, TYPE_CHECKING, Tuple
+from typing import Any, Callable, Dict, Optional, Sequence, Type, TYPE_CHECKING, Tuple
 
 import click
 from rich.console import JustifyMethod
@@ -14,6 +14,8 @@ from typer.models import (
 if TYPE_CHECKING:
     from typer import Typer
 
+    from .params import ParamSet
+
 
 class TyperInfo(_TyperInfo):
     def __init__(
@@ -87,6 +89,7 @@ class CommandInfo(TyperCommandInfo):
         no_args_is_help: bool = False,
         hidden: bool = False,
         deprecated: bool = False,
+        param_sets: Sequence["ParamSet"] = (),
     ):
         self.name = name
         self.cls = cls
@@ -104,3 +107,4 @@ class CommandInfo(TyperCommandInfo):
         self.no_args_is_help = no_args_is_help
         self.hidden = hidden
         self.deprecated = deprecated
+        self.param_sets = param_sets
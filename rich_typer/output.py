@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Sequence, TextIO
+
+from rich.cells import cell_len, set_cell_size
+from rich.console import Console
+from rich.text import Text
+
+from .formatting import get_console, is_plain_output
+
+
+def _iter_chunks(rows: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _get_file(file: Optional[TextIO], console: Optional[Console]) -> TextIO:
+    if file is not None:
+        return file
+    return (console or get_console()).file
+
+
+def echo_jsonl(
+    rows: Iterable[Any],
+    file: Optional[TextIO] = None,
+    chunk_size: int = 1000,
+) -> None:
+    """每行一个 JSON 对象，按块写入
+
+    :rows: 任意可 JSON 序列化的对象
+    :file: 输出文件，默认为共享 Console 的输出
+    :chunk_size: 每次写入的行数
+    """
+    file = _get_file(file, None)
+    for chunk in _iter_chunks(rows, chunk_size):
+        file.write("".join(
+            json.dumps(row, default=str, ensure_ascii=False) + "\n" for row in chunk
+        ))
+        file.flush()
+
+
+def echo_csv(
+    rows: Iterable[Any],
+    columns: Optional[Sequence[str]] = None,
+    file: Optional[TextIO] = None,
+    chunk_size: int = 1000,
+) -> None:
+    """以 CSV 格式按块写入
+
+    :rows: dict 或序列；为 dict 时默认使用第一行的键作为列
+    :columns: 列名，给出时写入表头
+    :file: 输出文件，默认为共享 Console 的输出
+    :chunk_size: 每次写入的行数
+    """
+    file = _get_file(file, None)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for chunk in _iter_chunks(rows, chunk_size):
+        if not header_written:
+            if columns is None and isinstance(chunk[0], Mapping):
+                columns = list(chunk[0])
+            if columns is not None:
+                writer.writerow(columns)
+            header_written = True
+        if columns is not None and isinstance(chunk[0], Mapping):
+            writer.writerows([row.get(column) for column in columns] for row in chunk)
+        else:
+            writer.writerows(chunk)
+        file.write(buffer.getvalue())
+        file.flush()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("\n", " ")
+
+
+def _fit_widths(widths: List[int], max_width: int, spacing: int) -> List[int]:
+    """总宽度超出时，从最宽的列开始收缩"""
+    widths = list(widths)
+    available = max_width - spacing * (len(widths) - 1)
+    while sum(widths) > available:
+        widest = max(range(len(widths)), key=widths.__getitem__)
+        if widths[widest] <= 4:
+            break
+        widths[widest] -= 1
+    return widths
+
+
+def echo_table(
+    rows: Iterable[Any],
+    columns: Optional[Sequence[str]] = None,
+    *,
+    console: Optional[Console] = None,
+    sample_size: int = 100,
+    chunk_size: int = 500,
+    spacing: int = 2,
+) -> None:
+    """流式输出表格
+
+    列宽只根据前 sample_size 行决定，之后的行按该宽度截断，
+    不需要把所有行读入内存，第一块数据准备好后立即输出。
+
+    :rows: dict 或序列；为 dict 时默认使用第一行的键作为列
+    :columns: 列名
+    :console: 默认使用共享 Console
+    :sample_size: 用于计算列宽的行数
+    :chunk_size: 每次写入的行数
+    :spacing: 列间距
+    """
+    # 给出 Console 时只根据它判断是否输出纯文本，不检查 sys.stdout
+    plain = not console.is_terminal if console else None
+    console = console or get_console()
+    if plain is None:
+        plain = is_plain_output() or not console.is_terminal
+    iterator = iter(rows)
+    sample = list(islice(iterator, sample_size))
+    if not sample:
+        return
+
+    is_mapping = isinstance(sample[0], Mapping)
+    if columns is None and is_mapping:
+        columns = list(sample[0])
+
+    def get_values(row: Any) -> List[Any]:
+        if is_mapping:
+            return [row.get(column) for column in columns]  # type: ignore
+        return list(row)
+
+    sample_values = [get_values(row) for row in sample]
+    column_count = len(columns) if columns is not None else len(sample_values[0])
+    # 每列至少 1 个字符宽，否则截断时 width - 1 会变成负数
+    widths = [1] * column_count
+    if columns is not None:
+        widths = [max(cell_len(column), 1) for column in columns]
+    numeric = [True] * column_count
+    for values in sample_values:
+        for index, value in enumerate(values[:column_count]):
+            widths[index] = max(widths[index], cell_len(_cell(value)))
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                numeric[index] = False
+    widths = _fit_widths(widths, console.width, spacing)
+    separator = " " * spacing
+
+    def format_row(values: Sequence[Any], align: bool = True) -> str:
+        cells = []
+        for index, width in enumerate(widths):
+            value = values[index] if index < len(values) else None
+            text = "" if value is None else str(value)
+            right = align and numeric[index]
+            if text.isascii() and text.isprintable():
+                # 绝大多数数据是 ASCII，直接按字符数填充
+                if len(text) > width:
+                    text = text[:width - 1] + "…" if width > 1 else "…"
+                else:
+                    text = text.rjust(width) if right else text.ljust(width)
+            else:
+                text = text.replace("\n", " ")
+                if cell_len(text) > width:
+                    text = set_cell_size(text, width - 1) + "…" if width > 1 else "…"
+                elif right:
+                    text = " " * (width - cell_len(text)) + text
+                else:
+                    text = set_cell_size(text, width)
+            cells.append(text)
+        return separator.join(cells).rstrip() + "\n"
+
+    if columns is not None:
+        header = format_row(columns, align=False)
+        if plain:
+            console.file.write(header)
+        else:
+            console.print(Text(header.rstrip("\n"), style="bold"), soft_wrap=True)
+
+    remaining = chain(sample_values, (get_values(row) for row in iterator))
+    for chunk in _iter_chunks(remaining, chunk_size):
+        lines = "".join(format_row(values) for values in chunk)
+        if plain:
+            console.file.write(lines)
+            console.file.flush()
+        else:
+            console.print(
+                lines.rstrip("\n"), markup=False, highlight=False, emoji=False, soft_wrap=True
+            )
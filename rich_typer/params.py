@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import weakref
+from functools import update_wrapper
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import click
+from typer.main import get_callback
+
+from .signature import get_params_convertors_ctx_param_name
+
+# 共享参数的帮助信息缓存：param -> {(show_default, auto_envvar_prefix): help_record}
+_help_records: "weakref.WeakKeyDictionary[click.Parameter, Dict[Any, Optional[Tuple[str, str]]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class ParamSet:
+    """一组在多个命令之间共享的参数
+
+    参数从函数签名中解析，只构建一次，挂载到每个命令上的是同一批 click.Parameter。
+    命令执行前，会先用这组参数的值调用该函数。
+    """
+
+    def __init__(self, callback: Callable[..., Any], name: Optional[str] = None) -> None:
+        self.callback = callback
+        self.name = name or callback.__name__
+        self._params: Optional[List[click.Parameter]] = None
+        self._invoke: Optional[Callable[..., Any]] = None
+
+    def _build(self) -> None:
+        (
+            params,
+            convertors,
+            context_param_name,
+        ) = get_params_convertors_ctx_param_name(self.callback)
+        self._invoke = get_callback(
+            callback=self.callback,
+            params=params,
+            convertors=convertors,
+            context_param_name=context_param_name,
+        )
+        for param in params:
+            _help_records[param] = {}
+        self._params = params
+
+    @property
+    def params(self) -> List[click.Parameter]:
+        if self._params is None:
+            self._build()
+        return self._params  # type: ignore
+
+    @property
+    def names(self) -> List[str]:
+        return [param.name for param in self.params if param.name]
+
+    def invoke(self, values: Dict[str, Any]) -> Any:
+        if self._params is None:
+            self._build()
+        return self._invoke(**values)  # type: ignore
+
+
+def get_param_sets_params(
+    param_sets: Sequence[ParamSet],
+    command_name: str,
+    command_names: Sequence[str] = (),
+) -> List[click.Parameter]:
+    """取出所有共享参数，参数名与命令或其他参数组重复时报错
+
+    :param_sets: 挂载到命令上的参数组
+    :command_name: 命令名称，用于错误信息
+    :command_names: 命令自身的参数名
+    """
+    owners: Dict[str, str] = {name: f"command '{command_name}'" for name in command_names}
+    params: List[click.Parameter] = []
+    for param_set in param_sets:
+        for name in param_set.names:
+            if name in owners:
+                raise TypeError(
+                    f"Parameter '{name}' of param set '{param_set.name}' conflicts with "
+                    f"the parameter of the same name in {owners[name]}"
+                )
+            owners[name] = f"param set '{param_set.name}'"
+        params.extend(param_set.params)
+    return params
+
+
+def get_param_sets_callback(
+    callback: Optional[Callable[..., Any]], param_sets: Sequence[ParamSet]
+) -> Optional[Callable[..., Any]]:
+    """先用共享参数的值调用各个 ParamSet，再把剩余参数交给命令回调"""
+    if not callback or not param_sets:
+        return callback
+
+    def wrapper(**kwargs: Any) -> Any:
+        for param_set in param_sets:
+            param_set.invoke({name: kwargs.pop(name) for name in param_set.names})
+        return callback(**kwargs)  # type: ignore
+
+    update_wrapper(wrapper, callback)
+    return wrapper
+
+
+def get_help_record(param: click.Parameter, ctx: click.Context) -> Optional[Tuple[str, str]]:
+    records = _help_records.get(param)
+    # default_map 会改变每个命令显示的默认值，这种情况不缓存
+    if records is None or ctx.default_map is not None:
+        return param.get_help_record(ctx)
+    key = (ctx.show_default, ctx.auto_envvar_prefix)
+    if key not in records:
+        records[key] = param.get_help_record(ctx)
+    return records[key]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+from types import TracebackType
+from typing import Any, Iterable, Iterator, List, Optional, Type, TypeVar
+
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    Progress as RichProgress,
+    TaskID,
+    TextColumn,
+    TimeElapsedColumn,
+    TimeRemainingColumn,
+)
+
+from .formatting import get_console
+
+T = TypeVar("T")
+
+
+class Progress:
+    """为大量条目设计的进度条
+
+    每个线程在自己的计数单元上累加，不加锁；后台线程按 refresh_per_second
+    汇总计数并重绘。输出不是终端时不绘制，只计数。
+
+    :total: 总数，None 表示未知
+    :description: 描述
+    :console: 默认使用与帮助信息共享的 Console
+    :refresh_per_second: 每秒最多重绘次数
+    :transient: 结束后清除进度条
+    :disable: 不绘制进度条，默认在非终端时自动开启
+    """
+
+    def __init__(
+        self,
+        total: Optional[float] = None,
+        description: str = "Working...",
+        *,
+        console: Optional[Console] = None,
+        refresh_per_second: float = 10,
+        transient: bool = False,
+        disable: Optional[bool] = None,
+    ) -> None:
+        self.total = total
+        self.description = description
+        self.console = console or get_console()
+        self.refresh_per_second = refresh_per_second
+        self.transient = transient
+        if disable is None:
+            disable = not self.console.is_terminal or self.console.is_dumb_terminal
+        self.disable = disable
+
+        self._cells: List[List[int]] = []
+        self._cells_lock = threading.Lock()
+        self._local = threading.local()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._progress: Optional[RichProgress] = None
+        self._task_id: Optional[TaskID] = None
+
+    @property
+    def completed(self) -> int:
+        return sum(cell[0] for cell in self._cells)
+
+    def _get_cell(self) -> List[int]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0]
+            # 每个线程只在第一次计数时加锁注册
+            with self._cells_lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def advance(self, advance: int = 1) -> None:
+        """增加计数，可以在任意线程中调用；批量处理时传入条目数"""
+        try:
+            self._local.cell[0] += advance
+        except AttributeError:
+            self._get_cell()[0] += advance
+
+    def track(self, iterable: Iterable[T]) -> Iterator[T]:
+        """遍历 iterable，每产出一个条目计数一次"""
+        cell = self._get_cell()
+        for item in iterable:
+            yield item
+            cell[0] += 1
+
+    def refresh(self) -> None:
+        if self._progress is None or self._task_id is None:
+            return
+        self._progress.update(self._task_id, completed=self.completed, refresh=True)
+
+    def _refresh_loop(self) -> None:
+        interval = 1 / self.refresh_per_second
+        while not self._stopped.wait(interval):
+            self.refresh()
+
+    def start(self) -> None:
+        if self.disable or self._progress is not None:
+            return
+        self._progress = RichProgress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.completed:,.0f}"),
+            TimeElapsedColumn(),
+            TimeRemainingColumn(),
+            console=self.console,
+            auto_refresh=False,
+            transient=self.transient,
+        )
+        self._task_id = self._progress.add_task(self.description, total=self.total)
+        self._progress.start()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._progress is None:
+            return
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.refresh()
+        self._progress.stop()
+        self._progress = None
+        self._task_id = None
+
+    def __enter__(self) -> "Progress":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+
+def track(
+    iterable: Iterable[T],
+    description: str = "Working...",
+    total: Optional[float] = None,
+    **kwargs: Any,
+) -> Iterator[T]:
+    """遍历 iterable 并显示进度，参数与 Progress 相同"""
+    if total is None and hasattr(iterable, "__len__"):
+        total = len(iterable)  # type: ignore
+    with Progress(total, description, **kwargs) as progress:
+        yield from progress.track(iterable)
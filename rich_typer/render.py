@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import io
+import threading
+import weakref
+from contextlib import contextmanager
+from queue import Empty, SimpleQueue
+from typing import Any, Dict, Iterator, Optional, Sequence, Union
+
+import click
+from rich.console import Console
+from typer import Typer
+
+from .formatting import THEME, RichHelpFormatter
+from .main import get_command
+
+HelpFormat = str  # "ansi" | "text" | "html"
+
+# app -> click 命令树，构建后只读，所有线程共享
+_commands: "weakref.WeakKeyDictionary[Any, click.Command]" = weakref.WeakKeyDictionary()
+_commands_lock = threading.Lock()
+
+# 每种格式一个 Console 池，每次调用独占一个 Console
+_console_pools: Dict[HelpFormat, "SimpleQueue[Console]"] = {
+    "ansi": SimpleQueue(),
+    "text": SimpleQueue(),
+    "html": SimpleQueue(),
+}
+
+
+def _get_command(app: Union[Typer, click.Command]) -> click.Command:
+    if isinstance(app, click.Command):
+        return app
+    command = _commands.get(app)
+    if command is None:
+        with _commands_lock:
+            command = _commands.get(app)
+            if command is None:
+                command = _commands[app] = get_command(app)
+    return command
+
+
+def _create_console(format: HelpFormat) -> Console:
+    return Console(
+        theme=THEME,
+        file=io.StringIO(),
+        force_terminal=format != "text",
+        color_system=None if format == "text" else "truecolor",
+        record=format == "html",
+        legacy_windows=False,
+    )
+
+
+@contextmanager
+def _acquire_console(format: HelpFormat, width: int) -> Iterator[Console]:
+    pool = _console_pools[format]
+    try:
+        console = pool.get_nowait()
+    except Empty:
+        console = _create_console(format)
+    console.width = width
+    try:
+        yield console
+    finally:
+        # 渲染出错时不能把残留内容留给下一次调用
+        if console.record:
+            with console._record_buffer_lock:
+                del console._record_buffer[:]
+        console.file.seek(0)
+        console.file.truncate()
+        pool.put(console)
+
+
+def _new_context(
+    command: click.Command, info_name: str, parent: Optional[click.Context] = None
+) -> click.Context:
+    # 与 Command.make_context 一样使用命令的 context_settings
+    extra = {**command.context_settings, "resilient_parsing": True}
+    return command.context_class(command, info_name=info_name, parent=parent, **extra)
+
+
+def _make_context(
+    command: click.Command,
+    command_path: Sequence[str],
+    prog_name: str,
+) -> click.Context:
+    ctx = _new_context(command, prog_name)
+    for name in command_path:
+        if not isinstance(ctx.command, click.MultiCommand):
+            raise click.UsageError(f"'{ctx.command_path}' has no sub-commands.", ctx)
+        sub_command = ctx.command.get_command(ctx, name)
+        if sub_command is None:
+            raise click.UsageError(f"No such command '{name}'.", ctx)
+        ctx = _new_context(sub_command, name, ctx)
+    return ctx
+
+
+def render_help(
+    app: Union[Typer, click.Command],
+    command_path: Union[str, Sequence[str]] = (),
+    width: int = 80,
+    format: HelpFormat = "ansi",
+    prog_name: Optional[str] = None,
+) -> str:
+    """将命令的帮助信息渲染为字符串，可以在多个线程中同时调用
+
+    :app: RichTyper 实例或 click 命令
+    :command_path: 子命令路径，如 "users create" 或 ["users", "create"]
+    :width: 渲染宽度
+    :format: "ansi" 带颜色的终端文本，"text" 无样式文本，"html" 内联样式的 HTML
+    :prog_name: 程序名称，默认使用根命令名称；根命令没有名称时必须给出
+    """
+    if format not in _console_pools:
+        raise ValueError(f"Unknown help format {format!r}, expected 'ansi', 'text' or 'html'")
+    if isinstance(command_path, str):
+        command_path = command_path.split()
+    command = _get_command(app)
+    # 嵌入在其他服务中时 sys.argv[0] 是宿主进程，不能用作程序名称
+    prog_name = prog_name or command.name
+    if not prog_name:
+        raise ValueError("prog_name is required when the root command has no name")
+    ctx = _make_context(command, command_path, prog_name)
+
+    with _acquire_console(format, width) as console:
+        formatter = RichHelpFormatter(width=width, console=console)
+        if format == "html":
+            # capture() 期间的输出不会被记录，直接写入 Console 自带的 StringIO
+            ctx.command.format_help(ctx, formatter)
+            return console.export_html(inline_styles=True, clear=True)
+        with console.capture() as capture:
+            ctx.command.format_help(ctx, formatter)
+        return capture.get()
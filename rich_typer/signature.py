@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import inspect
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+from typer.main import get_params_convertors_ctx_param_name_from_function
+
+
+class SignatureCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
+class _Entry(NamedTuple):
+    version: Tuple[Any, ...]
+    params: List[click.Parameter]
+    convertors: Dict[str, Callable[[str], Any]]
+    context_param_name: Optional[str]
+    doc: Optional[str]
+
+
+# callback -> 解析结果，函数被回收后自动清除
+_cache: "weakref.WeakKeyDictionary[Callable[..., Any], _Entry]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _get_version(callback: Callable[..., Any]) -> Tuple[Any, ...]:
+    # 函数的代码、默认值（typer 的 Option/Argument）或文档字符串被替换后缓存失效
+    return (
+        getattr(callback, "__code__", None),
+        getattr(callback, "__defaults__", None),
+        getattr(callback, "__kwdefaults__", None),
+        getattr(callback, "__doc__", None),
+    )
+
+
+def _get_entry(callback: Callable[..., Any], count: bool = True) -> _Entry:
+    global _hits, _misses
+    version = _get_version(callback)
+    with _lock:
+        try:
+            entry = _cache.get(callback)
+        except TypeError:  # 不支持弱引用的可调用对象
+            entry = None
+        if entry is not None and entry.version == version:
+            _hits += count
+            return entry
+        _misses += count
+
+    (
+        params,
+        convertors,
+        context_param_name,
+    ) = get_params_convertors_ctx_param_name_from_function(callback)
+    entry = _Entry(version, params, convertors, context_param_name, inspect.getdoc(callback))
+    with _lock:
+        try:
+            _cache[callback] = entry
+        except TypeError:
+            pass
+    return entry
+
+
+def get_params_convertors_ctx_param_name(
+    callback: Optional[Callable[..., Any]],
+) -> Tuple[List[click.Parameter], Dict[str, Callable[[str], Any]], Optional[str]]:
+    """带缓存的 get_params_convertors_ctx_param_name_from_function
+
+    返回的列表和字典是副本，click.Parameter 对象在多次构建之间共享。
+    """
+    if callback is None:
+        return get_params_convertors_ctx_param_name_from_function(callback)
+    entry = _get_entry(callback)
+    return list(entry.params), dict(entry.convertors), entry.context_param_name
+
+
+def get_callback_doc(callback: Callable[..., Any]) -> Optional[str]:
+    """带缓存的 inspect.getdoc，不计入命中统计"""
+    return _get_entry(callback, count=False).doc
+
+
+def signature_cache_info() -> SignatureCacheInfo:
+    with _lock:
+        return SignatureCacheInfo(_hits, _misses, len(_cache))
+
+
+def clear_signature_cache() -> None:
+    global _hits, _misses
+    with _lock:
+        _cache.clear()
+        _hits = _misses = 0
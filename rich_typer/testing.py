@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import copy
+import threading
+import weakref
+from typing import Any, Dict, Tuple, Union
+
+import click
+from click.testing import CliRunner, Result
+from typer import Typer
+
+from .main import get_command
+
+# app -> {(width, color): command}，每个进程（pytest-xdist worker）各自一份
+_command_cache: "weakref.WeakKeyDictionary[Any, Dict[Tuple[int, bool], click.Command]]" = (
+    weakref.WeakKeyDictionary()
+)
+_cache_lock = threading.Lock()
+
+
+class RichCliRunner(CliRunner):
+    """CliRunner for RichTyper apps.
+
+    The click command is built once per app and reused across invocations.
+    Help is always rendered by Rich at a fixed width without color, so the
+    output is captured by the runner and stable across terminals.
+
+    Commands are cached on first use; call :func:`clear_cache` after
+    registering more commands on an app that was already invoked.
+    """
+
+    def __init__(self, width: int = 80, color: bool = False, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.width = width
+        self.color = color
+
+    def get_command(self, app: Union[Typer, click.Command]) -> click.Command:
+        key = (self.width, self.color)
+        with _cache_lock:
+            commands = _command_cache.setdefault(app, {})
+            command = commands.get(key)
+            if command is None:
+                if isinstance(app, click.Command):
+                    command = copy.copy(app)
+                else:
+                    command = get_command(app)
+                # terminal_width 与 color 会被子命令的 Context 继承
+                command.context_settings = {
+                    **command.context_settings,
+                    "terminal_width": self.width,
+                    "color": self.color,
+                }
+                commands[key] = command
+        return command
+
+    def invoke(  # type: ignore
+        self, app: Union[Typer, click.Command], *args: Any, **kwargs: Any
+    ) -> Result:
+        kwargs.setdefault("color", self.color)
+        return super().invoke(self.get_command(app), *args, **kwargs)
+
+
+def clear_cache() -> None:
+    """Drop the commands cached by every :class:`RichCliRunner`."""
+    with _cache_lock:
+        _command_cache.clear()
@@ -1,4 +1,6 @@
-from typing import Tuple, Optional
+import importlib
+import re
+from typing import Any, Tuple, Optional
 
 from rich.text import Text
 
@@ -22,3 +24,33 @@ def blend_text(
         color = f"#{int(r1 + dr * blend):2X}{int(g1 + dg * blend):2X}{int(b1 + db * blend):2X}"
         text.stylize(color, index, index + 1)
     return text
+
+
+# 与 rich.markup 的标签规则一致：小写字母、#、/、@ 开头的方括号才是标签
+RE_MARKUP_TAGS = re.compile(r"(\\*)\[([a-z#/@][^[]*?)]")
+
+
+def strip_markup(markup: str) -> str:
+    """Remove rich markup tags, keeping escaped brackets as literal text."""
+    def _replace(match: "re.Match[str]") -> str:
+        backslashes, tag = match.groups()
+        escaped, odd = divmod(len(backslashes), 2)
+        if odd:
+            return "\\" * escaped + f"[{tag}]"
+        return "\\" * escaped
+
+    return RE_MARKUP_TAGS.sub(_replace, markup)
+
+
+def import_app(target: str) -> Any:
+    """Import an object from a ``module:attr`` (or ``module.attr``) path."""
+    if ":" in target:
+        module_name, _, attr = target.partition(":")
+    else:
+        module_name, _, attr = target.rpartition(".")
+    if not module_name or not attr:
+        raise ValueError(f"Expected 'module:app', got {target!r}")
+    obj = importlib.import_module(module_name)
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+    return obj
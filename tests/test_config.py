@@ -0,0 +1,63 @@
+import os
+
+from click.testing import CliRunner
+
+from rich_typer import Option, RichTyper, render_help
+from rich_typer.config import ConfigStore
+from rich_typer.main import get_command
+
+
+def make_app(config_file: str) -> RichTyper:
+    app = RichTyper(name="cli", config_files=[config_file], config_cache=False)
+    users = RichTyper()
+    app.add_typer(users, name="users")
+
+    @users.command()
+    def create(admin: bool = Option(False, "--admin/--no-admin")) -> None:
+        print(f"admin={admin}")
+
+    @users.command()
+    def delete() -> None:
+        ...
+
+    return app
+
+
+def test_help_shows_config_default_value(tmp_path) -> None:
+    config_file = tmp_path / "cli.toml"
+    config_file.write_text("[users.create]\nadmin = true\n")
+    app = make_app(str(config_file))
+
+    help = render_help(app, "users create", width=200, format="text")
+    assert f"default: admin; config: {config_file}" in help
+
+    result = CliRunner().invoke(get_command(app), ["users", "create"])
+    assert result.output == "admin=True\n"
+
+
+def test_cache_invalidated_when_file_changes(tmp_path) -> None:
+    config_file = tmp_path / "cli.json"
+    cache_dir = str(tmp_path / "cache")
+    config_file.write_text('{"name": "a"}')
+    assert ConfigStore([str(config_file)], cache_dir).sections[""]["name"][0] == "a"
+
+    # 大小变化
+    config_file.write_text('{"name": "bb"}')
+    assert ConfigStore([str(config_file)], cache_dir).sections[""]["name"][0] == "bb"
+
+    # 大小不变，只有 mtime 变化
+    stat = os.stat(config_file)
+    config_file.write_text('{"name": "cc"}')
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert ConfigStore([str(config_file)], cache_dir).sections[""]["name"][0] == "cc"
+
+
+def test_cache_reused_when_file_unchanged(tmp_path) -> None:
+    config_file = tmp_path / "cli.json"
+    cache_dir = str(tmp_path / "cache")
+    config_file.write_text('{"name": "a"}')
+    ConfigStore([str(config_file)], cache_dir).sections
+    (cache_file,) = os.listdir(cache_dir)
+    mtime = os.stat(os.path.join(cache_dir, cache_file)).st_mtime_ns
+    assert ConfigStore([str(config_file)], cache_dir).sections[""]["name"][0] == "a"
+    assert os.stat(os.path.join(cache_dir, cache_file)).st_mtime_ns == mtime
@@ -0,0 +1,23 @@
+from rich_typer import RichTyper
+from rich_typer.export import iter_command_records
+from rich_typer.main import get_command
+
+app = RichTyper(name="cli")
+
+
+@app.command(context_settings={"help_option_names": ["-h", "--help"]})
+def deploy() -> None:
+    ...
+
+
+@app.command()
+def status() -> None:
+    ...
+
+
+def test_export_uses_context_settings() -> None:
+    records = {" ".join(record["path"]): record for record in iter_command_records(get_command(app))}
+    deploy_opts = [opt for param in records["cli deploy"]["params"] for opt in param["opts"]]
+    status_opts = [opt for param in records["cli status"]["params"] for opt in param["opts"]]
+    assert "-h" in deploy_opts
+    assert "-h" not in status_opts
@@ -0,0 +1,32 @@
+from click.testing import CliRunner
+
+from rich_typer import RichTyper
+from rich_typer.formatting import PlainHelpFormatter, RichHelpFormatter
+from rich_typer.main import get_command
+
+app = RichTyper(name="cli")
+
+
+@app.command()
+def deploy(name: str) -> None:
+    """Deploy the service."""
+
+
+@app.command()
+def status() -> None:
+    ...
+
+
+def test_plain_formatter_is_not_a_rich_formatter() -> None:
+    assert not isinstance(PlainHelpFormatter(), RichHelpFormatter)
+
+
+def test_plain_help_and_usage_error_when_piped() -> None:
+    # CliRunner 的输出不是终端，使用 PlainHelpFormatter
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(get_command(app), ["deploy", "--help"])
+    assert result.output.startswith("Usage: cli deploy [OPTIONS] NAME\n")
+    assert "╭" not in result.output
+
+    result = runner.invoke(get_command(app), ["deploy"])
+    assert result.stderr.startswith("Usage: cli deploy [OPTIONS] NAME\n")
@@ -0,0 +1,43 @@
+import pytest
+
+from rich_typer import RichTyper, render_help
+
+app = RichTyper(name="cli")
+
+
+@app.command(context_settings={"help_option_names": ["-h", "--help"]})
+def deploy(name: str) -> None:
+    """Deploy the service to production."""
+
+
+@app.command()
+def status() -> None:
+    """Show the service status."""
+
+
+@pytest.mark.parametrize("format", ["ansi", "text", "html"])
+def test_render_help_contains_help_text(format: str) -> None:
+    output = render_help(app, "deploy", format=format)
+    assert "Deploy the service to production." in output
+
+
+def test_render_help_html_does_not_leak_between_calls() -> None:
+    render_help(app, "deploy", format="html")
+    output = render_help(app, "status", format="html")
+    assert "Show the service status." in output
+    assert "Deploy the service to production." not in output
+
+
+def test_render_help_uses_context_settings() -> None:
+    output = render_help(app, "deploy", format="text")
+    assert "-h" in output.split()
+    assert "Usage: cli deploy" in output
+
+
+def test_render_help_requires_prog_name_for_unnamed_app() -> None:
+    unnamed = RichTyper()
+    unnamed.command()(status)
+    unnamed.command()(deploy)
+    with pytest.raises(ValueError):
+        render_help(unnamed, "status")
+    assert "Usage: tool status" in render_help(unnamed, "status", format="text", prog_name="tool")
@@ -0,0 +1,10 @@
+from rich_typer.signature import get_callback_doc
+
+
+def test_doc_cache_invalidated_when_doc_changes() -> None:
+    def f() -> None:
+        """old"""
+
+    assert get_callback_doc(f) == "old"
+    f.__doc__ = "new"
+    assert get_callback_doc(f) == "new"